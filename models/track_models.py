@@ -1,8 +1,14 @@
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
-@dataclass
+# sentinel stored in integer columns for "no value"
+MISSING_INT = -1
+
+
+@dataclass(slots=True)
 class spotifyTrack:
     spotify_track_id: str
     track_name: str
@@ -12,8 +18,9 @@ class spotifyTrack:
     is_explicit: bool
     added_at: Optional[datetime]
     popularity: Optional[int]
+    isrc: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class YouTubeCandidate:
     spotify_track_id: str
     video_id: str
@@ -24,7 +31,7 @@ class YouTubeCandidate:
     ranking_in_search: Optional[int]
     time_of_upload: Optional[datetime]
 
-@dataclass
+@dataclass(slots=True)
 class TrackMatch:
     spotify_Track_id: str
     youtube_video_id: str
@@ -33,3 +40,257 @@ class TrackMatch:
     duration_difference: int
     is_version_match: bool
     matched_at: datetime
+
+
+# ================= COLUMNAR BATCHES =================
+def _intern(value) -> str:
+    return sys.intern(value) if value else ""
+
+
+def _int_or_missing(value) -> int:
+    return MISSING_INT if value is None else int(value)
+
+
+def _missing_to_none(value: int) -> Optional[int]:
+    return None if value == MISSING_INT else value
+
+
+class TrackBatch:
+    """
+    Column-per-field container for spotify_tracks_silver rows.
+    Strings are interned, numeric fields live in typed arrays.
+    """
+
+    COLUMNS = (
+        "spotify_track_id",
+        "track_name",
+        "artist",
+        "album_name",
+        "duration_ms",
+        "is_explicit",
+        "added_at",
+        "popularity",
+        "isrc",
+        # match features, computed once when Silver is loaded
+        "norm_title",
+        "norm_artist",
+        "title_fingerprint",
+        "is_live",
+        "is_remix",
+        "is_remaster",
+        "is_cover",
+    )
+    __slots__ = COLUMNS
+
+    def __init__(self):
+        self.spotify_track_id: List[str] = []
+        self.track_name: List[str] = []
+        self.artist: List[str] = []
+        self.album_name: List[str] = []
+        self.duration_ms = array("q")
+        self.is_explicit = array("b")
+        self.added_at = array("q")
+        self.popularity = array("i")
+        self.isrc: List[str] = []
+        self.norm_title: List[str] = []
+        self.norm_artist: List[str] = []
+        self.title_fingerprint: List[str] = []
+        self.is_live = array("b")
+        self.is_remix = array("b")
+        self.is_remaster = array("b")
+        self.is_cover = array("b")
+
+    def __len__(self) -> int:
+        return len(self.spotify_track_id)
+
+    def __getitem__(self, i: int) -> spotifyTrack:
+        added_at = self.added_at[i]
+        return spotifyTrack(
+            spotify_track_id=self.spotify_track_id[i],
+            track_name=self.track_name[i],
+            artist=[self.artist[i]] if self.artist[i] else [],
+            album_name=self.album_name[i] or None,
+            duration_ms=self.duration_ms[i],
+            is_explicit=bool(self.is_explicit[i]),
+            added_at=datetime.utcfromtimestamp(added_at) if added_at else None,
+            popularity=self.popularity[i],
+            isrc=self.isrc[i] or None,
+        )
+
+    def append(
+        self,
+        spotify_track_id,
+        track_name,
+        artist,
+        album_name=None,
+        duration_ms=0,
+        is_explicit=0,
+        added_at=0,
+        popularity=0,
+        isrc="",
+        norm_title="",
+        norm_artist="",
+        title_fingerprint="",
+        is_live=0,
+        is_remix=0,
+        is_remaster=0,
+        is_cover=0,
+    ):
+        self.spotify_track_id.append(_intern(spotify_track_id))
+        self.track_name.append(_intern(track_name))
+        self.artist.append(_intern(artist))
+        self.album_name.append(_intern(album_name))
+        self.duration_ms.append(duration_ms or 0)
+        self.is_explicit.append(1 if is_explicit else 0)
+        self.added_at.append(added_at or 0)
+        self.popularity.append(popularity or 0)
+        self.isrc.append(_intern(isrc))
+        self.norm_title.append(_intern(norm_title))
+        self.norm_artist.append(_intern(norm_artist))
+        self.title_fingerprint.append(_intern(title_fingerprint))
+        self.is_live.append(1 if is_live else 0)
+        self.is_remix.append(1 if is_remix else 0)
+        self.is_remaster.append(1 if is_remaster else 0)
+        self.is_cover.append(1 if is_cover else 0)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "TrackBatch":
+        """Build from rows ordered like COLUMNS (tuples or sqlite3.Row)."""
+        batch = cls()
+        for row in rows:
+            batch.append(*row)
+        return batch
+
+    def rows(self) -> Iterator[Tuple]:
+        """Yield one tuple per track, ordered like COLUMNS (for executemany)."""
+        return zip(*(getattr(self, name) for name in self.COLUMNS))
+
+
+class CandidateBatch:
+    """
+    Column-per-field container for youtube_tracks_silver rows.
+    Optional integers are stored as MISSING_INT and restored to None on output.
+    """
+
+    COLUMNS = (
+        "spotify_track_id",
+        "youtube_video_id",
+        "title",
+        "channel_name",
+        "duration_seconds",
+        "view_count",
+        "ranking_in_search",
+        "time_of_upload",
+        "fetched_at",
+        # match features, computed once when Silver is loaded
+        "norm_title",
+        "norm_artist",
+        "title_fingerprint",
+        "is_live",
+        "is_remix",
+        "is_remaster",
+        "is_cover",
+        "is_topic_channel",
+        # 1 for the candidate Gold uses for this track
+        "is_selected",
+    )
+    __slots__ = COLUMNS
+
+    # columns written as NULL when empty / MISSING_INT
+    NULLABLE_STR = ("youtube_video_id", "title", "channel_name", "time_of_upload", "fetched_at")
+    NULLABLE_INT = ("duration_seconds", "view_count", "ranking_in_search")
+
+    def __init__(self):
+        self.spotify_track_id: List[str] = []
+        self.youtube_video_id: List[str] = []
+        self.title: List[str] = []
+        self.channel_name: List[str] = []
+        self.duration_seconds = array("q")
+        self.view_count = array("q")
+        self.ranking_in_search = array("i")
+        self.time_of_upload: List[str] = []
+        self.fetched_at: List[str] = []
+        self.norm_title: List[str] = []
+        self.norm_artist: List[str] = []
+        self.title_fingerprint: List[str] = []
+        self.is_live = array("b")
+        self.is_remix = array("b")
+        self.is_remaster = array("b")
+        self.is_cover = array("b")
+        self.is_topic_channel = array("b")
+        self.is_selected = array("b")
+
+    def __len__(self) -> int:
+        return len(self.spotify_track_id)
+
+    def __getitem__(self, i: int) -> YouTubeCandidate:
+        return YouTubeCandidate(
+            spotify_track_id=self.spotify_track_id[i],
+            video_id=self.youtube_video_id[i],
+            title=self.title[i],
+            channel_name=self.channel_name[i] or None,
+            duration_seconds=_missing_to_none(self.duration_seconds[i]),
+            view_count=_missing_to_none(self.view_count[i]),
+            ranking_in_search=_missing_to_none(self.ranking_in_search[i]),
+            time_of_upload=self.time_of_upload[i] or None,
+        )
+
+    def append(
+        self,
+        spotify_track_id,
+        youtube_video_id,
+        title,
+        channel_name=None,
+        duration_seconds=None,
+        view_count=None,
+        ranking_in_search=None,
+        time_of_upload=None,
+        fetched_at=None,
+        norm_title="",
+        norm_artist="",
+        title_fingerprint="",
+        is_live=0,
+        is_remix=0,
+        is_remaster=0,
+        is_cover=0,
+        is_topic_channel=0,
+        is_selected=0,
+    ):
+        self.spotify_track_id.append(_intern(spotify_track_id))
+        self.youtube_video_id.append(_intern(youtube_video_id))
+        self.title.append(_intern(title))
+        self.channel_name.append(_intern(channel_name))
+        self.duration_seconds.append(_int_or_missing(duration_seconds))
+        self.view_count.append(_int_or_missing(view_count))
+        self.ranking_in_search.append(_int_or_missing(ranking_in_search))
+        self.time_of_upload.append(_intern(time_of_upload))
+        self.fetched_at.append(_intern(fetched_at))
+        self.norm_title.append(_intern(norm_title))
+        self.norm_artist.append(_intern(norm_artist))
+        self.title_fingerprint.append(_intern(title_fingerprint))
+        self.is_live.append(1 if is_live else 0)
+        self.is_remix.append(1 if is_remix else 0)
+        self.is_remaster.append(1 if is_remaster else 0)
+        self.is_cover.append(1 if is_cover else 0)
+        self.is_topic_channel.append(1 if is_topic_channel else 0)
+        self.is_selected.append(1 if is_selected else 0)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "CandidateBatch":
+        """Build from rows ordered like COLUMNS (tuples or sqlite3.Row)."""
+        batch = cls()
+        for row in rows:
+            batch.append(*row)
+        return batch
+
+    def rows(self) -> Iterator[Tuple]:
+        """Yield one DB-ready tuple per candidate, ordered like COLUMNS."""
+        columns = []
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            if name in self.NULLABLE_STR:
+                column = (value or None for value in column)
+            elif name in self.NULLABLE_INT:
+                column = map(_missing_to_none, column)
+            columns.append(column)
+        return zip(*columns)
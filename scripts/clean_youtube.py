@@ -1,71 +1,79 @@
-import sqlite3
 import json
+import sys
+from itertools import groupby
 from pathlib import Path
 
 # ========== PATHS ==========
 BASE_DIR = Path(__file__).parent.parent
-JOBS_DB = BASE_DIR / "data" / "jobs.db"
 RAW_DIR = BASE_DIR / "data" / "scrapetube" / "youtube"
+TOP_K = 3  # candidates kept per track, so re-matching never needs a re-search
+UNRANKED = 999  # sort position of a candidate without a search rank
+sys.path.append(str(BASE_DIR.resolve()))
 
-
-def get_db_connection():
-    conn = sqlite3.connect(str(JOBS_DB))
-    conn.row_factory = sqlite3.Row
-    return conn
+from models.track_models import MISSING_INT, CandidateBatch
+from storage import get_storage
+from match_features import CANDIDATE_FEATURES, candidate_features, is_topic_channel
+from profiling import latest_job_id, profile_stage, split_profile_flag
 
 
 def create_youtube_tracks_silver_table():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-
-    create_table_sql = """
-    CREATE TABLE youtube_tracks_silver (
-        spotify_track_id TEXT,
-        youtube_video_id TEXT,
-        title TEXT,
-        channel_name TEXT,
-        duration_seconds INTEGER,
-        view_count INTEGER,
-        ranking_in_search INTEGER,
-        time_of_upload TEXT,
-        fetched_at TEXT
-    )
-    """
-
-    cursor.execute(create_table_sql)
-    conn.commit()
-    conn.close()
+    get_storage().recreate_youtube_silver_table()
     print("Recreated youtube_tracks_silver table")
 
 
-def select_best_candidate(candidates):
+def selection_key(is_topic, ranking_in_search):
     """
       selection logic
     - Prefer 'Topic' channels
     - Otherwise fallback to rank 1
+    A missing rank (None, or MISSING_INT in a batch) sorts after every real one.
     """
+    if ranking_in_search is None or ranking_in_search == MISSING_INT:
+        ranking_in_search = UNRANKED
+    return (not is_topic, ranking_in_search)
+
 
+def select_best_candidate(candidates):
+    """Best of a track's Bronze search candidates (dicts with channel and ranking_in_search)."""
     if not candidates:
         return None
+    return min(
+        candidates,
+        key=lambda c: selection_key(
+            c.get("is_topic_channel", is_topic_channel(c.get("channel"))),
+            c.get("ranking_in_search"),
+        ),
+    )
+
 
-    topic_candidates = [
-        c
+def with_features(candidates):
+    """Attach match features to raw Bronze candidates, once per load."""
+    return [
+        {**c, **candidate_features(c.get("title"), c.get("channel"))}
         for c in candidates
-        if c.get("channel") and "topic" in c.get("channel").lower()
     ]
 
-    if topic_candidates:
-        # pick lowest ranking among Topic channels
-        return min(topic_candidates, key=lambda c: c.get("ranking_in_search", 999))
 
-    # fallback: rank 1
-    return min(candidates, key=lambda c: c.get("ranking_in_search", 999))
+def top_k_candidates(candidates, k=TOP_K):
+    ranked = sorted(candidates, key=lambda c: c.get("ranking_in_search") or UNRANKED)
+    return ranked[:k]
 
 
-def extract_and_insert_youtube_silver_data():
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def select_candidates(batch):
+    """
+    Row index of the best candidate of every track in a CandidateBatch, read straight
+    from its columns. Rows of a track are contiguous, as loaded and as fetched.
+    """
+    topic, rank = batch.is_topic_channel, batch.ranking_in_search
+    return [
+        min(indexes, key=lambda i: selection_key(topic[i], rank[i]))
+        for _, indexes in groupby(range(len(batch)), key=batch.spotify_track_id.__getitem__)
+    ]
+
+
+def build_candidate_batch():
+    """Read scrapetube Bronze files; keep the top-K candidates per track, flag the selected one."""
+    batch = CandidateBatch()
 
     for json_file in RAW_DIR.glob("*.json"):
         with open(json_file, "r", encoding="utf-8") as f:
@@ -73,46 +81,41 @@ def extract_and_insert_youtube_silver_data():
 
         spotify_track_id = raw_data["spotify_track_id"]
         fetched_at = raw_data.get("fetched_at")
-        candidates = raw_data.get("candidates", [])
-
-
-        best = select_best_candidate(candidates)
-
-        if not best:
-            continue
-
-        cursor.execute(
-            """
-            INSERT INTO youtube_tracks_silver (
-                spotify_track_id,
-                youtube_video_id,
-                title,
-                channel_name,
-                duration_seconds,
-                view_count,
-                ranking_in_search,
-                time_of_upload,
-                fetched_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                spotify_track_id,
-                best.get("video_id"),
-                best.get("title"),
-                best.get("channel"),
-                None,
-                None,
-                best.get("ranking_in_search"),
-                best.get("publish_time"),
-                fetched_at,
-            ),
-        )
-
-    conn.commit()
-    conn.close()
-    print("Inserted ONE selected YouTube video per Spotify track into Silver")
+        candidates = with_features(top_k_candidates(raw_data.get("candidates", [])))
 
+        for candidate in candidates:
+            batch.append(
+                spotify_track_id=spotify_track_id,
+                youtube_video_id=candidate.get("video_id"),
+                title=candidate.get("title"),
+                channel_name=candidate.get("channel"),
+                duration_seconds=None,
+                view_count=None,
+                ranking_in_search=candidate.get("ranking_in_search"),
+                time_of_upload=candidate.get("publish_time"),
+                fetched_at=fetched_at,
+                **{name: candidate[name] for name in CANDIDATE_FEATURES},
+            )
 
-if __name__ == "__main__":
+    # select over the stored rows, exactly as rematch.py does
+    for i in select_candidates(batch):
+        batch.is_selected[i] = 1
+
+    return batch
+
+
+def extract_and_insert_youtube_silver_data():
+    batch = build_candidate_batch()
+    get_storage().insert_youtube_candidates(batch)
+    print(f"Inserted {len(batch)} top-{TOP_K} YouTube candidates into Silver (one selected per track)")
+
+
+def build_youtube_silver():
     create_youtube_tracks_silver_table()
     extract_and_insert_youtube_silver_data()
+
+
+if __name__ == "__main__":
+    _, profile = split_profile_flag(sys.argv[1:])
+    with profile_stage(latest_job_id() if profile else None, "clean_youtube", enabled=profile):
+        build_youtube_silver()
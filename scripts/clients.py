@@ -0,0 +1,187 @@
+"""
+clients.py - Long-lived API clients on shared, connection-pooled sessions
+Every stage gets its Spotify / YouTube / scrapetube / YT Music client from
+here, so keep-alive connections and TLS sessions are reused across calls.
+
+Pool sizes, timeouts and retries come from .env:
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT, HTTP_RETRIES
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ========== PATHS ==========
+BASE_DIR = Path(__file__).resolve().parent.parent
+load_dotenv(BASE_DIR / ".env")
+
+# ========== CONFIG ==========
+ENV_CLIENT_ID = "SPOTIPY_CLIENT_ID"
+ENV_CLIENT_SECRET = "SPOTIPY_CLIENT_SECRET"
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))   # hosts per provider
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))          # connections per host
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+
+_lock = threading.RLock()
+_sessions = {}
+_clients = {}
+
+
+# ========== SESSIONS ==========
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter with a default timeout and a request counter."""
+
+    def __init__(self, timeout=HTTP_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        self.requests_sent = 0
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+
+class SharedSession(requests.Session):
+    """Session that survives libraries calling close() on it."""
+
+    def close(self):
+        pass
+
+
+def get_session(provider: str) -> requests.Session:
+    """One keep-alive, pooled session per provider for the whole process."""
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            adapter = PooledAdapter(
+                pool_connections=HTTP_POOL_CONNECTIONS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                max_retries=Retry(
+                    total=HTTP_RETRIES,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                ),
+            )
+            session = SharedSession()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[provider] = session
+        return session
+
+
+def connection_stats():
+    """Requests sent vs. new connections opened, per provider session."""
+    stats = {}
+    for provider, session in list(_sessions.items()):
+        adapter = session.get_adapter("https://")
+        pools = adapter.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in pools.keys())
+        requests_sent = adapter.requests_sent
+        stats[provider] = {
+            "requests": requests_sent,
+            "connections_opened": connections,
+            "reuse_ratio": round(1 - connections / requests_sent, 3) if requests_sent else 0.0,
+        }
+
+    youtube = _clients.get("youtube_api")
+    if youtube is not None:
+        stats["youtube_api"] = {"open_connections": len(youtube._http.connections)}
+
+    return stats
+
+
+def print_connection_stats():
+    for provider, stats in connection_stats().items():
+        print(f"[clients] {provider}: {stats}")
+
+
+# ========== CLIENTS ==========
+def get_spotify_client():
+    import spotipy
+    from spotipy.oauth2 import SpotifyClientCredentials
+
+    with _lock:
+        client = _clients.get("spotify")
+        if client is None:
+            cid = os.getenv(ENV_CLIENT_ID)
+            secret = os.getenv(ENV_CLIENT_SECRET)
+            if not cid or not secret:
+                raise ValueError(f"Set {ENV_CLIENT_ID} and {ENV_CLIENT_SECRET} in .env")
+
+            auth = SpotifyClientCredentials(
+                client_id=cid,
+                client_secret=secret,
+                requests_session=get_session("spotify_auth"),
+                requests_timeout=HTTP_TIMEOUT,
+            )
+            # retries live on the session's adapter (429 honours Retry-After)
+            client = spotipy.Spotify(
+                auth_manager=auth,
+                requests_session=get_session("spotify"),
+                requests_timeout=HTTP_TIMEOUT,
+            )
+            _clients["spotify"] = client
+        return client
+
+
+def get_youtube_client():
+    """Data API v3 client, built once (discovery document fetched once)."""
+    import httplib2
+    from googleapiclient.discovery import build
+
+    with _lock:
+        client = _clients.get("youtube_api")
+        if client is None:
+            client = build(
+                "youtube",
+                "v3",
+                developerKey=os.getenv("YOUTUBE_API_KEY"),
+                http=httplib2.Http(timeout=HTTP_TIMEOUT),
+                cache_discovery=False,
+            )
+            _clients["youtube_api"] = client
+        return client
+
+
+class _RequestsShim:
+    """Stands in for the requests module inside scrapetube; Session() returns ours."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def Session(self):
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def get_scrapetube():
+    """scrapetube module, wired to our shared session instead of a new one per search."""
+    import scrapetube
+    import scrapetube.scrapetube as scrapetube_impl
+
+    with _lock:
+        if "scrapetube" not in _clients:
+            scrapetube_impl.requests = _RequestsShim(get_session("scrapetube"))
+            _clients["scrapetube"] = scrapetube
+        return _clients["scrapetube"]
+
+
+def get_ytmusic_client(auth_path):
+    from ytmusicapi import YTMusic
+
+    with _lock:
+        client = _clients.get("ytmusic")
+        if client is None:
+            client = YTMusic(str(auth_path), requests_session=get_session("ytmusic"))
+            _clients["ytmusic"] = client
+        return client
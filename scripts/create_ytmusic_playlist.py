@@ -1,72 +1,40 @@
-from ytmusicapi import YTMusic
-import sqlite3
+import sys
 from pathlib import Path
 from datetime import datetime
-import time
+
+from storage import get_storage
+from rate_limiter import RateLimiter
+from clients import get_ytmusic_client, print_connection_stats
+from profiling import latest_job_id, profile_stage, split_profile_flag
 
 # ================= PATHS =================
 BASE_DIR = Path(__file__).parent.parent
-JOBS_DB = BASE_DIR / "data" / "jobs.db"
 BROWSER_AUTH = BASE_DIR / "browser.json"
 
 # ================= CONFIG =================
 BATCH_SIZE = 100
-SLEEP_BETWEEN_BATCHES = 10 # seconds
+YTMUSIC_LIMIT = RateLimiter("ytmusic")  # one write per 10 seconds host-wide
 
 
 # ================= DB =================
-def get_db_connection():
-    conn = sqlite3.connect(str(JOBS_DB))
-    conn.row_factory = sqlite3.Row
-    return conn
-
-
 def fetch_latest_job_metadata():
     """
     Source of truth for which playlist is being synced.
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT spotify_playlist_id, playlist_name
-        FROM playlist_conversion_job
-        ORDER BY created_at DESC
-        LIMIT 1
-    """
-    )
-
-    row = cur.fetchone()
-    conn.close()
+    metadata = get_storage().fetch_latest_job_metadata()
 
-    if row is None:
+    if metadata is None:
         raise Exception("No playlist_conversion_job found")
 
-    return row["spotify_playlist_id"], row["playlist_name"]
+    return metadata
 
 
 def fetch_youtube_video_ids():
     """
-    youtube_tracks_silver already guarantees:
-    - 1 row = 1 Spotify track
-    - 1 YouTube video per track
+    youtube_tracks_silver keeps top-K candidates per track;
+    is_selected = 1 guarantees 1 YouTube video per Spotify track
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT youtube_video_id
-        FROM youtube_tracks_silver
-        WHERE youtube_video_id IS NOT NULL
-    """
-    )
-
-    rows = cur.fetchall()
-    conn.close()
-
-    video_ids = [row["youtube_video_id"] for row in rows]
+    video_ids = get_storage().fetch_youtube_video_ids()
 
     if not video_ids:
         raise Exception("No YouTube videos found in youtube_tracks_silver")
@@ -76,7 +44,7 @@ def fetch_youtube_video_ids():
 
 # ================= MAIN =================
 def create_ytmusic_playlist():
-    ytmusic = YTMusic(str(BROWSER_AUTH))
+    ytmusic = get_ytmusic_client(BROWSER_AUTH)
 
     # 1. Job metadata
     spotify_playlist_id, playlist_name = fetch_latest_job_metadata()
@@ -91,9 +59,10 @@ def create_ytmusic_playlist():
     print(f"Creating YouTube Music playlist: {playlist_name}")
 
     # 2. Create playlist
-    yt_playlist_id = ytmusic.create_playlist(
-        title=playlist_name, description=description, privacy_status="PRIVATE"
-    )
+    with YTMUSIC_LIMIT.throttled():
+        yt_playlist_id = ytmusic.create_playlist(
+            title=playlist_name, description=description, privacy_status="PRIVATE"
+        )
 
     print(f"Playlist created: {yt_playlist_id}")
 
@@ -107,13 +76,15 @@ def create_ytmusic_playlist():
         batch = video_ids[i : i + BATCH_SIZE]
         print(f"Adding tracks {i + 1} → {i + len(batch)}")
 
-        ytmusic.add_playlist_items(playlistId=yt_playlist_id, videoIds=batch)
-
-        time.sleep(SLEEP_BETWEEN_BATCHES)
+        with YTMUSIC_LIMIT.throttled():
+            ytmusic.add_playlist_items(playlistId=yt_playlist_id, videoIds=batch)
 
     print("Playlist creation completed successfully")
+    print_connection_stats()
 
 
 # ================= ENTRY =================
 if __name__ == "__main__":
-    create_ytmusic_playlist()
+    _, profile = split_profile_flag(sys.argv[1:])
+    with profile_stage(latest_job_id() if profile else None, "create_ytmusic_playlist", enabled=profile):
+        create_ytmusic_playlist()
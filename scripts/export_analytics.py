@@ -0,0 +1,187 @@
+"""
+export_analytics.py - Columnar analytics export
+Copies each job's Silver / Gold / mapping rows to Parquet, partitioned by job
+and date, so reporting never has to query the operational store.
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ========== PATHS ==========
+BASE_DIR = Path(__file__).parent.parent
+SPOTIFY_RAW_DIR = BASE_DIR / "data" / "raw" / "spotify"
+ANALYTICS_DIR = BASE_DIR / "data" / "analytics"
+sys.path.append(str(BASE_DIR.resolve()))
+
+from models.track_models import CandidateBatch, TrackBatch
+from storage import get_storage
+from profiling import profile_stage, split_profile_flag
+
+# ========== SCHEMAS ==========
+# fixed per table, so an all-NULL column in one export never becomes type `null`
+INT_COLUMNS = {
+    "duration_ms", "is_explicit", "added_at", "popularity",
+    "duration_seconds", "view_count", "ranking_in_search",
+    "is_live", "is_remix", "is_remaster", "is_cover", "is_topic_channel", "is_selected",
+}
+
+
+def table_schema(columns):
+    return pa.schema([(name, pa.int64() if name in INT_COLUMNS else pa.string()) for name in columns])
+
+
+EXPORT_SCHEMAS = {
+    "spotify_tracks_silver": table_schema(TrackBatch.COLUMNS),
+    "youtube_tracks_silver": table_schema(CandidateBatch.COLUMNS),
+    "youtube_tracks_gold": table_schema((
+        "spotify_track_id", "youtube_video_id", "title", "channel_name", "time_of_upload", "fetched_at",
+    )),
+    "spotify_youtube_mapping": table_schema(("spotify_track_id", "youtube_video_id", "created_at")),
+}
+PARTITIONING = ds.partitioning(
+    pa.schema([("job_id", pa.string()), ("date", pa.string())]), flavor="hive"
+)
+
+
+# ========== JOB ROWS ==========
+def job_track_ids(job_id):
+    """Spotify track ids of the job, from its Bronze playlist file."""
+    raw_path = SPOTIFY_RAW_DIR / f"{job_id}.json"
+    if not raw_path.exists():
+        print(f"[export] raw file not found: {raw_path}")
+        return []
+
+    with open(raw_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    items = data.get("tracks", {}).get("items", [])
+    return [(item.get("track") or {}).get("id") for item in items]
+
+
+def read_job_table(table, track_ids):
+    """The job's rows of one table as an Arrow table with the table's fixed schema."""
+    schema = EXPORT_SCHEMAS[table]
+    rows = get_storage().fetch_rows_for_tracks(table, schema.names, track_ids)
+    columns = list(zip(*rows)) if rows else [[] for _ in schema.names]
+    return pa.table({name: list(col) for name, col in zip(schema.names, columns)}, schema=schema)
+
+
+# ========== EXPORT ==========
+def partition_dir(table, job_id, export_date):
+    return ANALYTICS_DIR / table / f"job_id={job_id}" / f"date={export_date}"
+
+
+def export_table(table, track_ids, job_id, export_date):
+    """
+    Write the job's rows of one table into its (job_id, date) partition.
+    Existing partitions are left untouched, so re-runs only append new ones.
+    """
+    out_dir = partition_dir(table, job_id, export_date)
+    out_path = out_dir / "part-0.parquet"
+
+    if out_path.exists():
+        print(f"[SKIP] {table} partition job_id={job_id} date={export_date} exists")
+        return None
+
+    arrow_table = read_job_table(table, track_ids)
+    if arrow_table.num_rows == 0:
+        print(f"[SKIP] {table} has no rows for job {job_id}")
+        return None
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_dir / "part-0.parquet.tmp"
+    pq.write_table(arrow_table, tmp_path, compression="zstd")
+    tmp_path.replace(out_path)
+
+    print(f"[export] {table}: {arrow_table.num_rows} rows -> {out_path}")
+    return out_path
+
+
+def job_date(job_id):
+    """Partition date of a job: the day it was created, so each job is exported once."""
+    job = get_storage().fetch_job(job_id)
+    if job and job.get("created_at"):
+        return job["created_at"][:10]
+    print(f"[export] job {job_id} not registered, partitioning by today's date")
+    return datetime.utcnow().date().isoformat()
+
+
+def export_analytics(job_id, export_date=None):
+    """export_date overrides the job's own date (e.g. to re-snapshot a job on purpose)."""
+    export_date = export_date or job_date(job_id)
+    track_ids = job_track_ids(job_id)
+
+    written = []
+    for table in EXPORT_SCHEMAS:
+        path = export_table(table, track_ids, job_id, export_date)
+        if path:
+            written.append(path)
+
+    return written
+
+
+# ========== QUERY HELPERS ==========
+def open_dataset(table):
+    """Hive-partitioned Arrow dataset over every exported partition of a table."""
+    return ds.dataset(
+        str(ANALYTICS_DIR / table),
+        schema=pa.unify_schemas([EXPORT_SCHEMAS[table], PARTITIONING.schema]),
+        format="parquet",
+        partitioning=PARTITIONING,
+    )
+
+
+def read_table(table, columns=None, job_id=None, since_date=None):
+    """
+    Read exported partitions as an Arrow table.
+    Parquet pages are decoded straight into Arrow buffers, no per-row Python objects.
+    """
+    expr = None
+    if job_id is not None:
+        expr = ds.field("job_id") == job_id
+    if since_date is not None:
+        date_expr = ds.field("date") >= since_date
+        expr = date_expr if expr is None else expr & date_expr
+
+    return open_dataset(table).to_table(columns=columns, filter=expr)
+
+
+def match_summary(job_id=None):
+    """
+    Match rate and Topic-channel hit rate over the exported history.
+    Counted per distinct track, since a track exported by several jobs appears in each partition.
+    """
+    tracks = read_table("spotify_tracks_silver", ["spotify_track_id"], job_id=job_id)
+    gold = read_table("youtube_tracks_gold", ["spotify_track_id", "channel_name"], job_id=job_id)
+
+    total = pc.count_distinct(tracks["spotify_track_id"]).as_py()
+    matched = pc.count_distinct(gold["spotify_track_id"]).as_py()
+    is_topic = pc.match_substring(pc.utf8_lower(gold["channel_name"]), "topic")
+    topic = pc.count_distinct(gold["spotify_track_id"].filter(pc.fill_null(is_topic, False))).as_py()
+
+    return {
+        "tracks": total,
+        "matched": matched,
+        "match_rate": matched / total if total else 0.0,
+        "topic_hit_rate": topic / matched if matched else 0.0,
+    }
+
+
+# ========== MAIN ==========
+if __name__ == "__main__":
+    args, profile = split_profile_flag(sys.argv[1:])
+    if len(args) < 1:
+        print("Usage: python export_analytics.py <job_id> [YYYY-MM-DD] [--profile]")
+        sys.exit(1)
+
+    job = args[0]
+    date_arg = args[1] if len(args) > 1 else None
+    with profile_stage(job, "export_analytics", enabled=profile):
+        paths = export_analytics(job, date_arg)
+    print(f"Exported {len(paths)} partitions")
@@ -1,51 +1,29 @@
-import sqlite3
-import spotipy
-import os
 from pathlib import Path
 import sys
 import json
 from datetime import datetime
-from dotenv import load_dotenv
-from spotipy.oauth2 import SpotifyClientCredentials
 from spotipy.exceptions import SpotifyException
 import time
 
+from storage import get_storage
+from rate_limiter import RateLimiter
+from clients import get_spotify_client, print_connection_stats
+from profiling import profile_stage, split_profile_flag
+
 BASE_DIR = Path(__file__).resolve().parent.parent
-JOBS_DB = BASE_DIR / 'data' / 'jobs.db'
 RAW_DIR = BASE_DIR / 'data' / 'raw' / 'spotify'
-ENV_CLIENT_ID = "SPOTIPY_CLIENT_ID"
-ENV_CLIENT_SECRET = "SPOTIPY_CLIENT_SECRET"
-JOBS_DB.parent.mkdir(parents=True, exist_ok=True)
-
+SPOTIFY_LIMIT = RateLimiter("spotify")
 
-def get_db_conn():
-    conn = sqlite3.connect(str(JOBS_DB))
-    conn.row_factory = sqlite3.Row
-    return conn
 
 def get_spotify_playlist_id(job_id: str) -> str:
-    conn = get_db_conn()
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT spotify_playlist_id FROM playlist_conversion_job WHERE job_id = ?",
-            (job_id,),
-        )
-        row = cur.fetchone()
-        if row and row["spotify_playlist_id"]:
-            return row["spotify_playlist_id"]
-        raise ValueError(f"No spotify_playlist_id for job_id={job_id}")
-    finally:
-        conn.close()
+    playlist_id = get_storage().get_spotify_playlist_id(job_id)
+    if playlist_id:
+        return playlist_id
+    raise ValueError(f"No spotify_playlist_id for job_id={job_id}")
 
 def build_spotify_client():
-    load_dotenv(BASE_DIR / ".env")
-    cid = os.getenv(ENV_CLIENT_ID)
-    secret = os.getenv(ENV_CLIENT_SECRET)
-    if not cid or not secret:
-        raise ValueError(f"Set {ENV_CLIENT_ID} and {ENV_CLIENT_SECRET} in .env")
-    auth = SpotifyClientCredentials(client_id=cid, client_secret=secret)
-    return spotipy.Spotify(auth_manager=auth, requests_timeout=10, retries=3)
+    # shared, pooled client; see clients.py
+    return get_spotify_client()
 
 
 def fetch_spotify_playlist_raw(job_id: str, max_retries: int = 3):
@@ -58,16 +36,18 @@ def fetch_spotify_playlist_raw(job_id: str, max_retries: int = 3):
     attempt = 0
     while True:
         try:
-            meta = sp.playlist(
-                playlist_id, fields="name,description,tracks(total),owner"
-            )
+            with SPOTIFY_LIMIT.throttled():
+                meta = sp.playlist(
+                    playlist_id, fields="name,description,tracks(total),owner"
+                )
             total = meta.get("tracks", {}).get("total", 0)
 
             items = []
             limit = 100
             offset = 0
             while True:
-                page = sp.playlist_tracks(playlist_id, limit=limit, offset=offset)
+                with SPOTIFY_LIMIT.throttled():  # shared budget across all running jobs
+                    page = sp.playlist_tracks(playlist_id, limit=limit, offset=offset)
                 page_items = page.get("items", [])
                 items.extend(page_items)
                 print(
@@ -76,7 +56,6 @@ def fetch_spotify_playlist_raw(job_id: str, max_retries: int = 3):
                 if not page.get("next"):
                     break
                 offset += limit
-                time.sleep(0.2)  # polite pause between pages
 
             # attach items and metadata
             meta["tracks"]["items"] = items
@@ -105,35 +84,23 @@ def fetch_spotify_playlist_raw(job_id: str, max_retries: int = 3):
 
 
 def update_job_status(job_id: str, status: str, finished_at: datetime = None):
-    conn = get_db_conn()
-    try:
-        cur = conn.cursor()
-        if finished_at:
-            cur.execute(
-                "UPDATE playlist_conversion_job SET status = ?, finished_at = ? WHERE job_id = ?",
-                (status, finished_at.isoformat(), job_id),
-            )
-        else:
-            cur.execute(
-                "UPDATE playlist_conversion_job SET status = ? WHERE job_id = ?",
-                (status, job_id),
-            )
-        conn.commit()
-    finally:
-        conn.close()
+    get_storage().update_job_status(job_id, status, finished_at)
 
 if __name__ == "__main__":
     import sys
 
-    if len(sys.argv) < 2:
-        print("Usage: python ingest_spotify.py <job_id>")
+    args, profile = split_profile_flag(sys.argv[1:])
+    if len(args) < 1:
+        print("Usage: python ingest_spotify.py <job_id> [--profile]")
         sys.exit(1)
-    job = sys.argv[1]
+    job = args[0]
     try:
         update_job_status(job, "RUNNING")
-        res = fetch_spotify_playlist_raw(job)
+        with profile_stage(job, "ingest_spotify", enabled=profile):
+            res = fetch_spotify_playlist_raw(job)
         update_job_status(job, "DONE", finished_at=datetime.utcnow())
         print("Saved:", res)
+        print_connection_stats()
     except Exception as e:
         update_job_status(job, "FAILED", finished_at=datetime.utcnow())
         print("Job failed:", e)
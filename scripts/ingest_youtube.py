@@ -1,28 +1,23 @@
-import sqlite3
 import json
-import time
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-import os
-from googleapiclient.discovery import build
 from datetime import datetime
 
+from storage import get_storage
+from single_flight import SingleFlight, normalize_query_key
+from rate_limiter import RateLimiter
+from clients import get_youtube_client, print_connection_stats
+from profiling import latest_job_id, profile_stage, split_profile_flag
 
-load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
-JOBS_DB = BASE_DIR / "data" / "jobs.db"
 RAW_DIR = BASE_DIR / "data" / "raw" / "youtube"
-YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-YOUTUBE_API_SERVICE_NAME = "youtube"
-YOUTUBE_API_VERSION = "v3"
 RAW_DIR.mkdir(parents=True, exist_ok=True)
 
+SEARCHES = SingleFlight()
+YOUTUBE_LIMIT = RateLimiter("youtube_api")
+
 def youTube_search(query):
-    youtube = build(
-        YOUTUBE_API_SERVICE_NAME,
-        YOUTUBE_API_VERSION,
-        developerKey=YOUTUBE_API_KEY,
-    )
+    youtube = get_youtube_client()  # built once, connection kept alive
 
     request = youtube.search().list(
         part="snippet",
@@ -30,46 +25,62 @@ def youTube_search(query):
         maxResults=5,
         type="video"
     )
-    response = request.execute()
+    with YOUTUBE_LIMIT.throttled():
+        response = request.execute()
     return response
 
-def connect_db():
-    conn = sqlite3.connect(str(JOBS_DB))
-    conn.row_factory = sqlite3.Row
-    return conn
-
 def fetch_spotify_tracks():
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-    Select spotify_track_id ,track_name ,artist
-    FROM spotify_tracks_silver
-    """
-    )
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_spotify_tracks()
+
+
+def isrc_search_response(known):
+    """search.list-shaped response for a video resolved through the ISRC index."""
+    video_id, title, channel = known
+    return {
+        "kind": "youtube#searchListResponse",
+        "items": [{
+            "id": {"kind": "youtube#video", "videoId": video_id},
+            "snippet": {"title": title, "channelTitle": channel},
+        }],
+    }
 
 
 def ingest_youtube_bronze():
     tracks = fetch_spotify_tracks()
     print(f"Fetched {len(tracks)} tracks from spotify_tracks_silver")
 
-    for idx,track in enumerate(tracks, start=1):
-        spotify_track_id = track["spotify_track_id"]
-        track_name = track["track_name"]
-        artist = track["artist"]
+    # exact-key fast path: recordings we already matched confidently
+    known_isrcs = get_storage().lookup_isrc_videos(tracks.isrc)
+    print(f"{len(known_isrcs)} ISRCs resolved from the index, skipping their searches")
 
+    columns = zip(tracks.spotify_track_id, tracks.track_name, tracks.artist, tracks.isrc)
+    for idx, (spotify_track_id, track_name, artist, isrc) in enumerate(columns, start=1):
         out_path = RAW_DIR / f"{spotify_track_id}.json"
 
         if out_path.exists():
             print(f"[SKIP] {spotify_track_id} already exists.")
             continue
+
+        if isrc in known_isrcs:
+            payload = {
+                "spotify_track_id": spotify_track_id,
+                "query": None,
+                "isrc": isrc,
+                "fetched_at": datetime.utcnow().isoformat(),
+                "ingestion_method": "isrc_index",
+                "youtube_search_response": isrc_search_response(known_isrcs[isrc]),
+            }
+            with open(out_path,"w",encoding="utf-8") as f:
+                json.dump(payload,f,ensure_ascii=False,indent=2)
+            continue
+
         query = f"{track_name} {artist} lyrics"
         print(f"[{idx}/{len(tracks)}] Searching YouTube for: {query}")
         try:
-            search_response = youTube_search(query)
+            search_response = SEARCHES.do(
+                normalize_query_key("youtube_api", track_name, artist),
+                lambda: youTube_search(query),
+            )
 
             payload = {
                 "spotify_track_id": spotify_track_id,
@@ -79,9 +90,12 @@ def ingest_youtube_bronze():
             }
             with open(out_path,"w",encoding="utf-8") as f:
                 json.dump(payload,f,ensure_ascii=False,indent=2)
-            time.sleep(0.3)
         except Exception as e:
             print(f"Error fetching YouTube data for {spotify_track_id}: {e}")
 
+    print_connection_stats()
+
 if __name__ == "__main__":
-    ingest_youtube_bronze()
+    _, profile = split_profile_flag(sys.argv[1:])
+    with profile_stage(latest_job_id() if profile else None, "ingest_youtube", enabled=profile):
+        ingest_youtube_bronze()
@@ -1,65 +1,97 @@
-import sqlite3
 import json
+import sys
 from datetime import datetime
 from pathlib import Path
-import time
-import scrapetube
+
+from storage import get_storage
+from single_flight import SingleFlight, normalize_query_key
+from rate_limiter import RateLimiter
+from clients import get_scrapetube, print_connection_stats
+from profiling import latest_job_id, profile_stage, split_profile_flag
 
 # ========== PATHS ==========
 BASE_DIR = Path(__file__).parent.parent
-JOBS_DB = BASE_DIR / "data" / "jobs.db"
 RAW_DIR = BASE_DIR / "data" / "scrapetube" / "youtube"
 RAW_DIR.mkdir(parents=True, exist_ok=True)
 
-# ========== DB ==========
-def get_db_connection():
-    conn = sqlite3.connect(str(JOBS_DB))
-    conn.row_factory = sqlite3.Row
-    return conn
+SEARCHES = SingleFlight()
+SCRAPETUBE_LIMIT = RateLimiter("scrapetube")
 
+# ========== DB ==========
 def fetch_spotify_tracks():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT spotify_track_id, track_name, artist
-        FROM spotify_tracks_silver
-    """)
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return get_storage().fetch_spotify_tracks()
+
+# ========== SEARCH ==========
+def scrapetube_search(query):
+    # global safety pause, shared across processes
+    with SCRAPETUBE_LIMIT.throttled():
+        results = get_scrapetube().get_search(
+            query=query,
+            limit=3,          # IMPORTANT: keep low
+            sleep=1,
+            results_type="video",
+            sort_by="relevance"
+        )
+
+        # get_search is a generator; the requests happen while iterating
+        candidates = []
+        for rank, video in enumerate(results, start=1):
+            candidates.append({
+                "video_id": video.get("videoId"),
+                "title": video.get("title", {}).get("runs", [{}])[0].get("text"),
+                "channel": video.get("ownerText", {}).get("runs", [{}])[0].get("text"),
+                "ranking_in_search": rank,
+                "publish_time": video.get("publishedTimeText", {}).get("simpleText"),
+            })
+    return candidates
 
 # ========== INGEST ==========
+def write_isrc_match(spotify_track_id, isrc, known):
+    """Bronze record for a track resolved through the ISRC index (no search)."""
+    video_id, title, channel = known
+    payload = {
+        "spotify_track_id": spotify_track_id,
+        "query": None,
+        "isrc": isrc,
+        "fetched_at": datetime.utcnow().isoformat(),
+        "ingestion_method": "isrc_index",
+        "candidates": [{
+            "video_id": video_id,
+            "title": title,
+            "channel": channel,
+            "ranking_in_search": 1,
+            "publish_time": None,
+        }],
+    }
+
+    with open(RAW_DIR / f"{spotify_track_id}.json", "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
 def ingest_youtube_scrapetube():
     tracks = fetch_spotify_tracks()
     print(f"Fetched {len(tracks)} tracks from spotify_tracks_silver")
 
-    for idx, track in enumerate(tracks, start=1):
-        spotify_track_id = track["spotify_track_id"]
-        track_name = track["track_name"]
-        artist = track["artist"]
+    # exact-key fast path: recordings we already matched confidently
+    known_isrcs = get_storage().lookup_isrc_videos(tracks.isrc)
+    print(f"{len(known_isrcs)} ISRCs resolved from the index, skipping their searches")
+
+    columns = zip(tracks.spotify_track_id, tracks.track_name, tracks.artist, tracks.isrc)
+    for idx, (spotify_track_id, track_name, artist, isrc) in enumerate(columns, start=1):
+        if isrc in known_isrcs:
+            write_isrc_match(spotify_track_id, isrc, known_isrcs[isrc])
+            continue
 
         query = f'{track_name} {artist} Topic'
         print(f"[{idx}/{len(tracks)}] Searching YouTube: {query}")
 
         try:
-            results = scrapetube.get_search(
-                query=query,
-                limit=3,          # IMPORTANT: keep low
-                sleep=1,
-                results_type="video",
-                sort_by="relevance"
+            # identical (track, artist) searches from concurrent jobs share one call
+            candidates = SEARCHES.do(
+                normalize_query_key("scrapetube", track_name, artist),
+                lambda: scrapetube_search(query),
             )
 
-            candidates = []
-            for rank, video in enumerate(results, start=1):
-                candidates.append({
-                    "video_id": video.get("videoId"),
-                    "title": video.get("title", {}).get("runs", [{}])[0].get("text"),
-                    "channel": video.get("ownerText", {}).get("runs", [{}])[0].get("text"),
-                    "ranking_in_search": rank,
-                    "publish_time": video.get("publishedTimeText", {}).get("simpleText"),
-                })
-
             payload = {
                 "spotify_track_id": spotify_track_id,
                 "query": query,
@@ -71,13 +103,14 @@ def ingest_youtube_scrapetube():
             with open(RAW_DIR / f"{spotify_track_id}.json", "w", encoding="utf-8") as f:
                 json.dump(payload, f, ensure_ascii=False, indent=2)
 
-            time.sleep(1)  # global safety pause
-
         except Exception as e:
             print(f"Failed for {spotify_track_id}: {e}")
 
     print("scrapetube Bronze ingestion completed")
+    print_connection_stats()
 
 # ========== MAIN ==========
 if __name__ == "__main__":
-    ingest_youtube_scrapetube()
+    _, profile = split_profile_flag(sys.argv[1:])
+    with profile_stage(latest_job_id() if profile else None, "ingest_youtube_scrapetube", enabled=profile):
+        ingest_youtube_scrapetube()
@@ -1,56 +1,127 @@
-import sqlite3
-import uuid
-from datetime import datetime
+"""
+jobs.py - Job registry
+Registers playlist conversion jobs in the shared jobs DB (data/jobs.db, or
+Postgres via STORAGE_BACKEND) and answers status / user / time queries.
+
+    python jobs.py create <spotify_playlist_id> <playlist_name> <user_identifier>
+    python jobs.py import <jobs.csv>     # columns: spotify_playlist_id, playlist_name, user_identifier
+    python jobs.py list [--status S] [--user U] [--since ISO] [--limit N]
+    python jobs.py counts
+"""
+
+import csv
+import sys
+
+from storage import JOB_PAGE_SIZE, get_storage
+
+CSV_COLUMNS = ("spotify_playlist_id", "playlist_name", "user_identifier")
+
+_table_ready = False
 
-conn = sqlite3.connect("jobs.db")
-cursor = conn.cursor()
 
-cursor.execute(
+def _storage():
+    """Storage with the jobs table and its indexes in place (checked once per process)."""
+    global _table_ready
+    storage = get_storage()
+    if not _table_ready:
+        storage.create_jobs_table()
+        _table_ready = True
+    return storage
+
+
+# ========== CREATE ==========
+def create_jobs(jobs):
     """
-    CREATE TABLE IF NOT EXISTS playlist_conversion_job (
-        job_id TEXT PRIMARY KEY,
-        spotify_playlist_id TEXT,
-        playlist_name TEXT,
-        user_identifier TEXT,
-        status TEXT,
-        created_at TEXT,
-        finished_at TEXT
-    )
-"""
-)
+    Register many (spotify_playlist_id, playlist_name, user_identifier) jobs in one
+    transaction. A (user, playlist) pair with a PENDING/RUNNING job keeps that job;
+    once it has finished, registering the pair again starts a new one.
+    Returns job ids in input order.
+    """
+    jobs = [tuple(job) for job in jobs]
+    created, job_ids = _storage().create_jobs(jobs)
+    print(f"[jobs] {created} created, {len(jobs) - created} already active or repeated")
+    return [job_ids.get((user or "", playlist_id)) for playlist_id, _, user in jobs]
+
+
+def create_jobs_from_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = set(CSV_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+        return create_jobs(tuple(row[col] for col in CSV_COLUMNS) for row in reader)
 
 
 def create_job(
     spotify_playlist_id: str, playlist_name: str, user_identifier: str
 ) -> str:
-    job_id = str(uuid.uuid4())
-    created_at = datetime.utcnow().isoformat()
-
-    cursor.execute(
-        """
-        INSERT INTO playlist_conversion_job
-        (job_id, spotify_playlist_id, playlist_name, user_identifier, status, created_at, finished_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """,
-        (
-            job_id,
-            spotify_playlist_id,
-            playlist_name,
-            user_identifier,
-            "PENDING",
-            created_at,
-            None,
-        ),
+    return create_jobs([(spotify_playlist_id, playlist_name, user_identifier)])[0]
+
+
+# ========== QUERY ==========
+def get_job(job_id: str):
+    return _storage().fetch_job(job_id)
+
+
+def list_jobs(status=None, user_identifier=None, since=None, until=None,
+              cursor=None, limit=JOB_PAGE_SIZE):
+    """
+    One newest-first page of jobs and the cursor for the next page (None at the end).
+    Pages are keyset-paged on (created_at, job_id), so deep pages cost the same as the first.
+    """
+    rows = _storage().list_jobs(
+        status=status,
+        user_identifier=user_identifier,
+        since=since,
+        until=until,
+        after=cursor,
+        limit=limit,
     )
+    next_cursor = (rows[-1]["created_at"], rows[-1]["job_id"]) if len(rows) == limit else None
+    return rows, next_cursor
 
-    conn.commit()
-    return job_id
 
+def iter_jobs(status=None, user_identifier=None, since=None, until=None, page_size=JOB_PAGE_SIZE):
+    """Every matching job, newest first, fetched page by page."""
+    cursor = None
+    while True:
+        rows, cursor = list_jobs(status, user_identifier, since, until, cursor, page_size)
+        yield from rows
+        if cursor is None:
+            return
+
+
+def count_jobs_by_status():
+    return _storage().count_jobs_by_status()
+
+
+# ========== MAIN ==========
+def _option(args, name, default=None):
+    return args[args.index(name) + 1] if name in args[:-1] else default
 
-def get_job(job_id: str):
-    cursor.execute("SELECT * FROM playlist_conversion_job WHERE job_id = ?", (job_id,))
-    return cursor.fetchone()
 
 if __name__ == "__main__":
-    job_id = create_job("playlist123", "My Playlist", "test_user")
-    print(get_job(job_id))
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command == "create" and len(args) == 4:
+        print(get_job(create_job(args[1], args[2], args[3])))
+    elif command == "import" and len(args) == 2:
+        job_ids = create_jobs_from_csv(args[1])
+        print(f"{len(job_ids)} jobs registered from {args[1]}")
+    elif command == "list":
+        rows, _ = list_jobs(
+            status=_option(args, "--status"),
+            user_identifier=_option(args, "--user"),
+            since=_option(args, "--since"),
+            limit=int(_option(args, "--limit", JOB_PAGE_SIZE)),
+        )
+        for row in rows:
+            print(f"{row['created_at']}  {row['job_id']}  {row['status']:8} "
+                  f"{row['user_identifier']}  {row['playlist_name']}")
+    elif command == "counts":
+        for status, n in sorted(count_jobs_by_status().items(), key=lambda kv: str(kv[0])):
+            print(f"{status}: {n}")
+    else:
+        print(__doc__)
+        sys.exit(1)
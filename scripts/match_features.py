@@ -0,0 +1,73 @@
+"""
+match_features.py - Match features computed once at Silver load time
+Normalized title/artist, token fingerprints, version flags and the Topic
+channel flag, stored as columns so re-matching never redoes string work.
+"""
+
+import re
+import unicodedata
+
+# words that say nothing about which recording a title refers to
+NOISE_TOKENS = {
+    "official", "video", "audio", "lyrics", "lyric", "music", "hd", "hq",
+    "visualizer", "topic", "feat", "ft", "featuring", "the", "a", "and",
+}
+
+VERSION_PATTERNS = {
+    "is_live": re.compile(r"\blive\b"),
+    "is_remix": re.compile(r"\b(remix|rmx)\b"),
+    "is_remaster": re.compile(r"\bremaster(ed)?\b"),
+    "is_cover": re.compile(r"\bcover\b"),
+}
+
+TOPIC_SUFFIX = re.compile(r"\s*-\s*topic\s*$", re.IGNORECASE)
+
+TRACK_FEATURES = ("norm_title", "norm_artist", "title_fingerprint", *VERSION_PATTERNS)
+CANDIDATE_FEATURES = (*TRACK_FEATURES, "is_topic_channel")
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower().replace("&", " and ")
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def token_fingerprint(normalized):
+    """Sorted, de-duplicated tokens without noise words (order-insensitive key)."""
+    tokens = {t for t in normalized.split() if t not in NOISE_TOKENS}
+    return " ".join(sorted(tokens))
+
+
+def version_flags(normalized):
+    return {name: 1 if pattern.search(normalized) else 0 for name, pattern in VERSION_PATTERNS.items()}
+
+
+def is_topic_channel(channel_name):
+    # same rule select_best_candidate has always used
+    return 1 if channel_name and "topic" in channel_name.lower() else 0
+
+
+def track_features(track_name, artist):
+    """Feature columns for a spotify_tracks_silver row."""
+    norm_title = normalize_text(track_name)
+    return {
+        "norm_title": norm_title,
+        "norm_artist": normalize_text(artist),
+        "title_fingerprint": token_fingerprint(norm_title),
+        **version_flags(norm_title),
+    }
+
+
+def candidate_features(title, channel_name):
+    """Feature columns for a youtube_tracks_silver row."""
+    norm_title = normalize_text(title)
+    return {
+        "norm_title": norm_title,
+        "norm_artist": normalize_text(TOPIC_SUFFIX.sub("", channel_name or "")),
+        "title_fingerprint": token_fingerprint(norm_title),
+        **version_flags(norm_title),
+        "is_topic_channel": is_topic_channel(channel_name),
+    }
@@ -0,0 +1,155 @@
+"""
+plan_job.py - Pre-run cost and wall-clock estimate for a job
+Reads the playlist's track list, checks it against the ISRC index and (for the
+YouTube Data API ingester) the Bronze files already on disk - the things that
+let the ingesters skip a search - and estimates network calls, quota spend and
+duration per provider from latencies observed on past runs.
+"""
+
+import json
+import math
+import sys
+
+from create_ytmusic_playlist import BATCH_SIZE as PUBLISH_BATCH_SIZE
+from ingest_spotify import SPOTIFY_LIMIT, build_spotify_client, get_spotify_playlist_id
+from ingest_youtube import RAW_DIR as YOUTUBE_RAW_DIR
+from rate_limiter import PROVIDER_LIMITS, get_rate_limit_stats
+from single_flight import normalize_query_key
+from storage import get_storage
+
+# ========== CONFIG ==========
+SPOTIFY_PAGE_SIZE = 100
+YOUTUBE_SEARCH_QUOTA_UNITS = 100  # search.list cost in the Data API v3
+YOUTUBE_DAILY_QUOTA = 10000
+
+# seconds per call until a provider has observed latencies
+DEFAULT_LATENCY = {
+    "spotify": 0.3,
+    "youtube_api": 0.5,
+    "scrapetube": 1.5,
+    "ytmusic": 2.0,
+}
+
+
+# ========== SPOTIFY ==========
+def fetch_playlist_tracks(playlist_id):
+    """Minimal track list: id, name, first artist, ISRC."""
+    sp = build_spotify_client()
+
+    with SPOTIFY_LIMIT.throttled():
+        meta = sp.playlist(playlist_id, fields="name,tracks(total)")
+    total = meta.get("tracks", {}).get("total", 0)
+
+    tracks = []
+    offset = 0
+    while True:
+        with SPOTIFY_LIMIT.throttled():
+            page = sp.playlist_items(
+                playlist_id,
+                fields="items(track(id,name,artists(name),external_ids(isrc))),next",
+                limit=SPOTIFY_PAGE_SIZE,
+                offset=offset,
+            )
+        for item in page.get("items", []):
+            track = item.get("track") or {}
+            artists = track.get("artists") or [{}]
+            tracks.append({
+                "spotify_track_id": track.get("id"),
+                "track_name": track.get("name", ""),
+                "artist": artists[0].get("name", ""),
+                "isrc": (track.get("external_ids") or {}).get("isrc"),
+            })
+        if not page.get("next"):
+            break
+        offset += SPOTIFY_PAGE_SIZE
+
+    return meta.get("name"), total, tracks
+
+
+# ========== ESTIMATES ==========
+def seconds_per_call(provider, observed):
+    """A serial call costs its latency, but never less than the rate limit spacing."""
+    rate, _ = PROVIDER_LIMITS[provider]
+    latency = observed.get(provider) or DEFAULT_LATENCY[provider]
+    return max(latency, 1.0 / rate)
+
+
+def plan_job(job_id, search_provider="scrapetube"):
+    playlist_id = get_spotify_playlist_id(job_id)
+    playlist_name, total, tracks = fetch_playlist_tracks(playlist_id)
+
+    known_isrcs = get_storage().lookup_isrc_videos(t["isrc"] for t in tracks)
+
+    # the ingesters search every track without an ISRC index hit, mapped or not
+    unresolved = [t for t in tracks if t["isrc"] not in known_isrcs]
+    already_ingested = 0
+    if search_provider == "youtube_api":
+        # ingest_youtube skips tracks whose Bronze file is already on disk
+        pending = [
+            t for t in unresolved
+            if not (YOUTUBE_RAW_DIR / f"{t['spotify_track_id']}.json").exists()
+        ]
+        already_ingested = len(unresolved) - len(pending)
+        unresolved = pending
+
+    # repeats of a query within the run share one search; shared results only live
+    # for minutes, so they are not counted as saving searches across jobs
+    searches = len({
+        normalize_query_key(search_provider, t["track_name"], t["artist"])
+        for t in unresolved
+    })
+
+    observed = {
+        s["name"]: s["avg_latency_seconds"] for s in get_rate_limit_stats()
+    }
+
+    calls = {
+        "spotify": 1 + max(1, math.ceil(total / SPOTIFY_PAGE_SIZE)),
+        search_provider: searches,
+        "ytmusic": 1 + math.ceil(len(tracks) / PUBLISH_BATCH_SIZE),
+    }
+    durations = {
+        provider: round(n * seconds_per_call(provider, observed), 1)
+        for provider, n in calls.items()
+    }
+
+    plan = {
+        "job_id": job_id,
+        "playlist_name": playlist_name,
+        "tracks": total,
+        "resolved_by_isrc": len(tracks) - len(unresolved) - already_ingested,
+        "already_ingested": already_ingested,
+        "searches": searches,
+        "calls": calls,
+        "estimated_seconds": durations,
+        "estimated_total_seconds": round(sum(durations.values()), 1),
+    }
+    if search_provider == "youtube_api":
+        plan["youtube_quota_units"] = searches * YOUTUBE_SEARCH_QUOTA_UNITS
+        plan["youtube_quota_days"] = math.ceil(plan["youtube_quota_units"] / YOUTUBE_DAILY_QUOTA)
+
+    return plan
+
+
+# ========== MAIN ==========
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print("Usage: python plan_job.py <job_id> [--youtube-api] [--json]")
+        sys.exit(1)
+
+    provider = "youtube_api" if "--youtube-api" in sys.argv else "scrapetube"
+    result = plan_job(args[0], provider)
+
+    if "--json" in sys.argv:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Plan for job {result['job_id']} ({result['playlist_name']}): {result['tracks']} tracks")
+        print(f"  isrc={result['resolved_by_isrc']} "
+              f"on_disk={result['already_ingested']} searches={result['searches']}")
+        for provider_name, n in result["calls"].items():
+            print(f"  {provider_name:12} {n:6} calls  ~{result['estimated_seconds'][provider_name]}s")
+        if "youtube_quota_units" in result:
+            print(f"  YouTube quota: {result['youtube_quota_units']} units "
+                  f"(~{result['youtube_quota_days']} day(s) of default quota)")
+        print(f"  Estimated total: ~{result['estimated_total_seconds'] / 60:.1f} min")
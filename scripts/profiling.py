@@ -0,0 +1,125 @@
+"""
+profiling.py - Built-in per-stage CPU and memory profiling
+`--profile` on any stage (or run_pipeline.py) writes, per stage, to
+data/profiles/<job_id>/:
+    <stage>.prof         cProfile stats (snakeviz, pstats)
+    <stage>.folded       sampled stacks in folded format (flamegraph.pl, speedscope)
+    <stage>.memory.txt   tracemalloc peak and top allocation sites
+    <stage>.tracemalloc  raw tracemalloc snapshot
+"""
+
+import cProfile
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+# ========== PATHS ==========
+BASE_DIR = Path(__file__).parent.parent
+PROFILES_DIR = BASE_DIR / "data" / "profiles"
+
+# ========== CONFIG ==========
+PROFILE_FLAG = "--profile"
+SAMPLE_INTERVAL_SECONDS = 0.005
+TRACEMALLOC_FRAMES = 25
+TOP_ALLOCATIONS = 25
+
+
+def split_profile_flag(argv):
+    """(positional args without --profile, whether --profile was given)"""
+    args = [a for a in argv if a != PROFILE_FLAG]
+    return args, len(args) != len(argv)
+
+
+def latest_job_id():
+    """Job-less stages file their profiles under the newest job, like the publisher."""
+    from storage import get_storage
+
+    return get_storage().fetch_latest_job_id() or "adhoc"
+
+
+# ========== SAMPLER ==========
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts folded stacks."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# ========== STAGE PROFILE ==========
+def write_memory_report(path, snapshot, peak, elapsed):
+    stats = snapshot.statistics("lineno")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"peak traced memory: {peak / 1024 / 1024:.2f} MiB\n")
+        f.write(f"wall time: {elapsed:.2f}s\n\n")
+        f.write(f"top {TOP_ALLOCATIONS} allocation sites still live at stage end:\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+
+
+@contextmanager
+def profile_stage(job_id, stage, enabled=True):
+    """Profile the wrapped block as one stage; no-op when disabled."""
+    if not enabled:
+        yield
+        return
+
+    out_dir = PROFILES_DIR / str(job_id)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    sampler = StackSampler(threading.get_ident())
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(out_dir / f"{stage}.prof")
+        sampler.write_folded(out_dir / f"{stage}.folded")
+        snapshot.dump(str(out_dir / f"{stage}.tracemalloc"))
+        write_memory_report(out_dir / f"{stage}.memory.txt", snapshot, peak, elapsed)
+
+        print(
+            f"[profile] {stage}: {elapsed:.2f}s, peak {peak / 1024 / 1024:.1f} MiB -> {out_dir}"
+        )
@@ -0,0 +1,210 @@
+"""
+rate_limiter.py - Shared token-bucket rate limiter per external provider
+Bucket state lives in SQLite, so every process and job on the host draws
+from one budget per provider instead of sleeping independently.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# ========== PATHS ==========
+BASE_DIR = Path(__file__).parent.parent
+RATE_LIMIT_DB = BASE_DIR / "data" / "rate_limits.db"
+RATE_LIMIT_DB.parent.mkdir(parents=True, exist_ok=True)
+
+# ========== CONFIG ==========
+# provider -> (requests per second, burst capacity)
+PROVIDER_LIMITS = {
+    "spotify": (5.0, 5),         # playlist pages, was 0.2s between pages
+    "youtube_api": (3.0, 3),     # search.list, was 0.3s between searches
+    "scrapetube": (1.0, 1),      # scraped searches, was a 1s global pause
+    "ytmusic": (0.1, 1),         # playlist writes, was 10s between batches
+}
+
+
+# ========== DB ==========
+def get_db_connection():
+    # autocommit mode so acquire() can take BEGIN IMMEDIATE itself
+    conn = sqlite3.connect(str(RATE_LIMIT_DB), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def create_rate_limit_table():
+    conn = get_db_connection()
+    try:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit_bucket (
+                name TEXT PRIMARY KEY,
+                rate REAL NOT NULL,
+                capacity REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                acquired INTEGER NOT NULL DEFAULT 0,
+                waited_seconds REAL NOT NULL DEFAULT 0,
+                calls INTEGER NOT NULL DEFAULT 0,
+                call_seconds REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # buckets created before latency tracking
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(rate_limit_bucket)")}
+        for column in ("calls", "call_seconds"):
+            if column not in existing:
+                conn.execute(
+                    f"ALTER TABLE rate_limit_bucket ADD COLUMN {column} NUMERIC NOT NULL DEFAULT 0"
+                )
+    finally:
+        conn.close()
+
+
+# ========== LIMITER ==========
+class RateLimiter:
+    """
+    Usage:
+        SPOTIFY_LIMIT = RateLimiter("spotify")
+        SPOTIFY_LIMIT.acquire()   # blocks until the shared bucket has a token
+
+        with SPOTIFY_LIMIT.throttled():   # acquire + record the call's latency
+            page = sp.playlist_tracks(...)
+    """
+
+    def __init__(self, name: str, rate: float = None, capacity: float = None):
+        default_rate, default_capacity = PROVIDER_LIMITS.get(name, (1.0, 1))
+        self.name = name
+        self.rate = rate or default_rate
+        self.capacity = capacity or default_capacity
+
+        create_rate_limit_table()
+        conn = get_db_connection()
+        try:
+            # the latest configuration wins; token count is kept
+            conn.execute(
+                """
+                INSERT INTO rate_limit_bucket (name, rate, capacity, tokens, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    rate = excluded.rate,
+                    capacity = excluded.capacity
+                """,
+                (self.name, self.rate, self.capacity, self.capacity, time.time()),
+            )
+        finally:
+            conn.close()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Take tokens from the shared bucket, sleeping as needed. Returns seconds waited."""
+        waited = 0.0
+
+        while True:
+            conn = get_db_connection()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT rate, capacity, tokens, updated_at FROM rate_limit_bucket WHERE name = ?",
+                    (self.name,),
+                ).fetchone()
+
+                now = time.time()
+                elapsed = max(0.0, now - row["updated_at"])
+                available = min(row["capacity"], row["tokens"] + elapsed * row["rate"])
+
+                if available >= tokens:
+                    conn.execute(
+                        """
+                        UPDATE rate_limit_bucket
+                        SET tokens = ?, updated_at = ?,
+                            acquired = acquired + 1,
+                            waited_seconds = waited_seconds + ?
+                        WHERE name = ?
+                        """,
+                        (available - tokens, now, waited, self.name),
+                    )
+                    conn.execute("COMMIT")
+                    return waited
+
+                conn.execute(
+                    "UPDATE rate_limit_bucket SET tokens = ?, updated_at = ? WHERE name = ?",
+                    (available, now, self.name),
+                )
+                conn.execute("COMMIT")
+                wait = (tokens - available) / row["rate"]
+            finally:
+                conn.close()
+
+            time.sleep(wait)
+            waited += wait
+
+    @contextmanager
+    def throttled(self, tokens: float = 1):
+        """Acquire, then time the wrapped call so planners can use observed latency."""
+        self.acquire(tokens)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_latency(time.perf_counter() - started)
+
+    def record_latency(self, seconds: float):
+        conn = get_db_connection()
+        try:
+            conn.execute(
+                """
+                UPDATE rate_limit_bucket
+                SET calls = calls + 1, call_seconds = call_seconds + ?
+                WHERE name = ?
+                """,
+                (seconds, self.name),
+            )
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        return get_rate_limit_stats(self.name)[0]
+
+
+def get_rate_limit_stats(name: str = None):
+    """Current budget and wait statistics for one provider or all of them."""
+    create_rate_limit_table()
+    conn = get_db_connection()
+    try:
+        sql = "SELECT * FROM rate_limit_bucket"
+        params = ()
+        if name:
+            sql += " WHERE name = ?"
+            params = (name,)
+        rows = conn.execute(sql + " ORDER BY name", params).fetchall()
+    finally:
+        conn.close()
+
+    now = time.time()
+    stats = []
+    for row in rows:
+        available = min(
+            row["capacity"], row["tokens"] + max(0.0, now - row["updated_at"]) * row["rate"]
+        )
+        stats.append({
+            "name": row["name"],
+            "rate_per_second": row["rate"],
+            "capacity": row["capacity"],
+            "tokens_available": round(available, 3),
+            "acquired": row["acquired"],
+            "waited_seconds": round(row["waited_seconds"], 3),
+            "avg_wait_seconds": round(row["waited_seconds"] / row["acquired"], 3)
+            if row["acquired"]
+            else 0.0,
+            "calls": row["calls"],
+            "avg_latency_seconds": round(row["call_seconds"] / row["calls"], 3)
+            if row["calls"]
+            else None,
+        })
+    return stats
+
+
+# ========== MAIN ==========
+if __name__ == "__main__":
+    for bucket in get_rate_limit_stats():
+        print(bucket)
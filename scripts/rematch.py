@@ -0,0 +1,40 @@
+"""
+rematch.py - Offline re-matching from stored Silver candidates
+Re-runs candidate selection over the top-K candidates already in
+youtube_tracks_silver and rebuilds Gold. Makes no network calls.
+"""
+
+import sys
+
+from clean_youtube import select_candidates
+from playlist_tracks_gold import insert_gold_data, recreate_gold_table, update_isrc_index
+from storage import get_storage
+from profiling import latest_job_id, profile_stage, split_profile_flag
+
+
+def rematch(dry_run=False):
+    storage = get_storage()
+    batch = storage.fetch_youtube_candidates()
+
+    picks = select_candidates(batch)
+    selected = [(batch.spotify_track_id[i], batch.youtube_video_id[i]) for i in picks]
+    changed = sum(1 for i in picks if not batch.is_selected[i])
+
+    print(f"Re-matched {len(selected)} tracks from {len(batch)} stored candidates, {changed} changed")
+
+    if dry_run:
+        return {"tracks": len(selected), "changed": changed}
+
+    storage.update_selection(selected)
+    recreate_gold_table()
+    insert_gold_data()
+    update_isrc_index()
+
+    return {"tracks": len(selected), "changed": changed}
+
+
+# ========== MAIN ==========
+if __name__ == "__main__":
+    args, profile = split_profile_flag(sys.argv[1:])
+    with profile_stage(latest_job_id() if profile else None, "rematch", enabled=profile):
+        rematch(dry_run="--dry-run" in args)
@@ -0,0 +1,61 @@
+"""
+run_pipeline.py - Run one job end to end
+Bronze -> Silver -> Gold -> (optional) publish, each as its own stage, so
+`--profile` produces a separate profile per stage under data/profiles/<job_id>/.
+"""
+
+import sys
+from datetime import datetime
+
+from ingest_spotify import fetch_spotify_playlist_raw, update_job_status
+from clean_spotify import create_silver_data_table, extract_and_insert_silver_data
+from ingest_youtube_scrapetube import ingest_youtube_scrapetube
+from clean_youtube import build_youtube_silver
+from playlist_tracks_gold import build_gold
+from create_ytmusic_playlist import create_ytmusic_playlist
+from clients import print_connection_stats
+from profiling import profile_stage, split_profile_flag
+
+
+def clean_spotify(job_id):
+    create_silver_data_table()
+    if not extract_and_insert_silver_data(job_id):
+        raise RuntimeError("Spotify Silver load failed")
+
+
+def run_pipeline(job_id, profile=False, publish=True):
+    stages = [
+        ("ingest_spotify", lambda: fetch_spotify_playlist_raw(job_id)),
+        ("clean_spotify", lambda: clean_spotify(job_id)),
+        ("ingest_youtube_scrapetube", ingest_youtube_scrapetube),
+        ("clean_youtube", build_youtube_silver),
+        ("playlist_tracks_gold", build_gold),
+    ]
+    if publish:
+        stages.append(("create_ytmusic_playlist", create_ytmusic_playlist))
+
+    for stage, run in stages:
+        print(f"\n===== {stage} =====")
+        with profile_stage(job_id, stage, enabled=profile):
+            run()
+
+
+# ========== MAIN ==========
+if __name__ == "__main__":
+    args, profile = split_profile_flag(sys.argv[1:])
+    publish = "--no-publish" not in args
+    args = [a for a in args if a != "--no-publish"]
+    if len(args) < 1:
+        print("Usage: python run_pipeline.py <job_id> [--profile] [--no-publish]")
+        sys.exit(1)
+
+    job = args[0]
+    try:
+        update_job_status(job, "RUNNING")
+        run_pipeline(job, profile=profile, publish=publish)
+        update_job_status(job, "DONE", finished_at=datetime.utcnow())
+        print_connection_stats()
+    except Exception as e:
+        update_job_status(job, "FAILED", finished_at=datetime.utcnow())
+        print("Job failed:", e)
+        sys.exit(2)
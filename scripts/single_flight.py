@@ -0,0 +1,226 @@
+"""
+single_flight.py - Coalescing of duplicate in-flight searches
+The first caller for a normalized query key goes to the network; concurrent
+callers for the same key wait for that result instead of searching again.
+Threads share an in-process table, worker processes share a lease row in SQLite.
+A finished result is shared only for RESULT_TTL_SECONDS (so workers that were
+waiting on the lease can pick it up); this is not a long-lived search cache.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from match_features import normalize_text
+
+# ========== PATHS ==========
+BASE_DIR = Path(__file__).parent.parent
+JOBS_DB = BASE_DIR / "data" / "jobs.db"
+JOBS_DB.parent.mkdir(parents=True, exist_ok=True)
+
+# ========== CONFIG ==========
+LEASE_TTL_SECONDS = 120  # a crashed leader stops blocking others after this
+POLL_INTERVAL_SECONDS = 0.5
+RESULT_TTL_SECONDS = 300  # how long a finished search is shared with late followers
+
+
+# ========== KEYS ==========
+def normalize_query_key(provider: str, track_name: str, artist: str) -> str:
+    """Case/accent/punctuation-insensitive key for a (track, artist) search."""
+    return f"{provider}:{normalize_text(artist)}|{normalize_text(track_name)}"
+
+
+# ========== DB ==========
+def get_db_connection():
+    conn = sqlite3.connect(str(JOBS_DB), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def create_single_flight_tables():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_lease (
+            query_key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            acquired_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_result (
+            query_key TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            fetched_at TEXT NOT NULL,
+            stored_at REAL
+        )
+        """
+    )
+    # tables from before the TTL have no stored_at; their rows are never shared
+    columns = {row["name"] for row in cursor.execute("PRAGMA table_info(search_result)")}
+    if "stored_at" not in columns:
+        cursor.execute("ALTER TABLE search_result ADD COLUMN stored_at REAL")
+
+    conn.commit()
+    conn.close()
+
+
+# ========== SINGLE FLIGHT ==========
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Usage:
+        searches = SingleFlight()
+        result = searches.do(normalize_query_key("scrapetube", name, artist),
+                             lambda: run_search(query))
+
+    Results must be JSON-serializable; non-empty ones are shared through
+    search_result for result_ttl seconds. Empty results and errors are not shared.
+    """
+
+    def __init__(self, lease_ttl: float = LEASE_TTL_SECONDS, result_ttl: float = RESULT_TTL_SECONDS):
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {"network": 0, "shared": 0, "cached": 0}
+        create_single_flight_tables()
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+
+        if not leader:
+            call.event.wait()
+            self._count("shared")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._do_across_processes(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            call.event.set()
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _do_across_processes(self, key, fn):
+        while True:
+            cached = self._load_result(key)
+            if cached is not None:
+                self._count("cached")
+                return cached
+
+            if self._acquire_lease(key):
+                try:
+                    result = fn()
+                    if result:
+                        self._store_result(key, result)
+                    self._count("network")
+                    return result
+                finally:
+                    self._release_lease(key)
+
+            # another worker owns the lease; wait for its result or its expiry
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # ---------- lease rows ----------
+    def _acquire_lease(self, key) -> bool:
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            # single statement: insert, or take over an expired lease
+            conn.execute(
+                """
+                INSERT INTO search_lease (query_key, owner, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(query_key) DO UPDATE SET
+                    owner = excluded.owner,
+                    acquired_at = excluded.acquired_at,
+                    expires_at = excluded.expires_at
+                WHERE search_lease.expires_at < excluded.acquired_at
+                """,
+                (key, self.owner, now, now + self.lease_ttl),
+            )
+            conn.commit()
+            row = conn.execute(
+                "SELECT owner FROM search_lease WHERE query_key = ?", (key,)
+            ).fetchone()
+            return row is not None and row["owner"] == self.owner
+        finally:
+            conn.close()
+
+    def _release_lease(self, key):
+        conn = get_db_connection()
+        try:
+            conn.execute(
+                "DELETE FROM search_lease WHERE query_key = ? AND owner = ?",
+                (key, self.owner),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------- shared results ----------
+    def _load_result(self, key):
+        conn = get_db_connection()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM search_result WHERE query_key = ? AND stored_at >= ?",
+                (key, time.time() - self.result_ttl),
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row["payload"]) if row else None
+
+    def _store_result(self, key, result):
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            # expired rows are dropped as new ones arrive, so the table stays small
+            conn.execute(
+                "DELETE FROM search_result WHERE stored_at IS NULL OR stored_at < ?",
+                (now - self.result_ttl,),
+            )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO search_result (query_key, payload, fetched_at, stored_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(result, ensure_ascii=False), datetime.utcnow().isoformat(), now),
+            )
+            conn.commit()
+        finally:
+            conn.close()
@@ -0,0 +1,57 @@
+"""
+test_rate_limiter.py - Shared token bucket
+Buckets live in a throwaway rate_limits.db per test.
+
+    pytest test_rate_limiter.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR / "scripts"))
+
+import rate_limiter
+from rate_limiter import RateLimiter, get_rate_limit_stats
+
+RATE = 5.0  # one token every 0.2s
+
+
+@pytest.fixture(autouse=True)
+def rate_limit_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_DB", tmp_path / "rate_limits.db")
+
+
+def test_second_acquire_waits_for_a_token():
+    limiter = RateLimiter("test", rate=RATE, capacity=1)
+
+    assert limiter.acquire() == 0.0
+    started = time.monotonic()
+    waited = limiter.acquire()
+    elapsed = time.monotonic() - started
+
+    assert waited == pytest.approx(1 / RATE, abs=0.05)
+    assert elapsed == pytest.approx(1 / RATE, abs=0.1)
+
+
+def test_limiters_with_one_name_share_a_bucket():
+    RateLimiter("test", rate=RATE, capacity=1).acquire()
+    assert RateLimiter("test", rate=RATE, capacity=1).acquire() > 0
+
+
+def test_stats_report_acquired_and_waited_seconds():
+    limiter = RateLimiter("test", rate=RATE, capacity=1)
+    waited = limiter.acquire() + limiter.acquire()
+    with limiter.throttled():
+        time.sleep(0.01)
+
+    stats = limiter.stats()
+    assert stats["name"] == get_rate_limit_stats()[0]["name"] == "test"
+    assert stats["acquired"] == 3
+    assert stats["waited_seconds"] >= round(waited, 3) > 0
+    assert stats["avg_wait_seconds"] == pytest.approx(stats["waited_seconds"] / 3, abs=0.001)
+    assert stats["calls"] == 1
+    assert stats["avg_latency_seconds"] >= 0.01
@@ -0,0 +1,130 @@
+"""
+test_single_flight.py - Coalescing of duplicate searches
+Threads share one SingleFlight; separate SingleFlight instances stand in for
+worker processes, which only share the lease and result rows in jobs.db.
+
+    pytest test_single_flight.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR / "scripts"))
+
+import single_flight
+from single_flight import SingleFlight
+
+KEY = "scrapetube:beyonce|halo"
+
+
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(single_flight, "JOBS_DB", tmp_path / "jobs.db")
+    monkeypatch.setattr(single_flight, "POLL_INTERVAL_SECONDS", 0.01)
+
+
+class Search:
+    """Counting search that blocks until released, so callers pile up on its key."""
+
+    def __init__(self, result, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run(flight, key, fn, results):
+    def target():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            results.append(e)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def test_threads_on_one_key_search_once():
+    flight = SingleFlight()
+    search = Search(["v1"])
+    results = []
+
+    leader = run(flight, KEY, search, results)
+    assert search.started.wait(5)
+    follower = run(flight, KEY, search, results)
+    time.sleep(0.05)  # let the follower join the in-flight call
+    search.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == [["v1"], ["v1"]]
+    assert search.calls == 1
+    assert flight.stats == {"network": 1, "shared": 1, "cached": 0}
+
+
+def test_processes_on_one_key_search_once():
+    leader_flight, follower_flight = SingleFlight(), SingleFlight()
+    search = Search(["v1"])
+    follower_search = Search(["other"])
+    follower_search.release.set()
+    results = []
+
+    leader = run(leader_flight, KEY, search, results)
+    assert search.started.wait(5)
+    follower = run(follower_flight, KEY, follower_search, results)
+    time.sleep(0.05)  # the follower is polling the lease
+    search.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == [["v1"], ["v1"]]
+    assert (search.calls, follower_search.calls) == (1, 0)
+    assert follower_flight.stats == {"network": 0, "shared": 0, "cached": 1}
+
+
+def test_failing_leader_lets_a_follower_retry():
+    leader_flight, follower_flight = SingleFlight(), SingleFlight()
+    search = Search(None, error=RuntimeError("blocked"))
+    retry = Search(["v1"])
+    retry.release.set()
+    results = []
+
+    leader = run(leader_flight, KEY, search, results)
+    assert search.started.wait(5)
+    follower = run(follower_flight, KEY, retry, results)
+    time.sleep(0.05)
+    search.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == ["v1"]
+    assert retry.calls == 1
+    assert follower_flight.stats["network"] == 1
+
+
+def test_empty_result_is_not_shared():
+    first, second = SingleFlight(), SingleFlight()
+
+    assert first.do(KEY, lambda: []) == []
+    assert second.do(KEY, lambda: ["v1"]) == ["v1"]
+    assert second.stats == {"network": 1, "shared": 0, "cached": 0}
+
+    # a non-empty result is shared with a later caller within the TTL
+    assert first.do(KEY, lambda: ["other"]) == ["v1"]
+    assert first.stats["cached"] == 1